@@ -138,43 +138,72 @@ def convert_to_chempy_model(atom_array):
 
     annot_cat = atom_array.get_annotation_categories()
 
+    # Convert the annotation arrays into lists of Python objects once,
+    # as indexing NumPy arrays for each atom is slow
+    chain_ids = atom_array.chain_id.tolist()
+    res_ids = atom_array.res_id.tolist()
+    ins_codes = atom_array.ins_code.tolist()
+    res_names = atom_array.res_name.tolist()
+    hetero = atom_array.hetero.astype(int).tolist()
+    atom_names = atom_array.atom_name.tolist()
+    elements = atom_array.element.tolist()
+    if "b_factor" in annot_cat:
+        b_factors = atom_array.b_factor.tolist()
+    if "occupancy" in annot_cat:
+        occupancies = atom_array.occupancy.tolist()
+    if "charge" in annot_cat:
+        charges = atom_array.charge.tolist()
+    # Also handles an 'AtomArrayStack' with a single model
+    coords = atom_array.coord.reshape(-1, 3).tolist()
+
+    # The one-letter code needs to be determined only once
+    # for each residue name
+    unique_res_names, res_name_indices = np.unique(
+        atom_array.res_name, return_inverse=True
+    )
+    unique_res_codes = []
+    for res_name in unique_res_names.tolist():
+        if len(res_name) == 1:
+            unique_res_codes.append(res_name)
+        else:
+            try:
+                unique_res_codes.append(
+                    ProteinSequence.convert_letter_3to1(res_name)
+                )
+            except KeyError:
+                unique_res_codes.append("X")
+    res_codes = [unique_res_codes[i] for i in res_name_indices.tolist()]
+
 
     for i in range(atom_array.array_length()):
         atom = Atom()
 
-        atom.segi = atom_array.chain_id[i]
-        atom.chain = atom_array.chain_id[i]
+        atom.segi = chain_ids[i]
+        atom.chain = chain_ids[i]
 
-        atom.resi_number = atom_array.res_id[i]
+        atom.resi_number = res_ids[i]
 
-        atom.ins_code = atom_array.ins_code[i]
+        atom.ins_code = ins_codes[i]
         
-        res_name = atom_array.res_name[i]
-        atom.resn = res_name
-        if len(res_name) == 1:
-            atom.resn_code = res_name
-        else:
-            try:
-                atom.resn_code = ProteinSequence.convert_letter_3to1(res_name)
-            except KeyError:
-                atom.resn_code = "X"
+        atom.resn = res_names[i]
+        atom.resn_code = res_codes[i]
 
-        atom.hetatm = 1 if atom_array.hetero[i] else 0
+        atom.hetatm = hetero[i]
 
-        atom.name = atom_array.atom_name[i]
+        atom.name = atom_names[i]
 
-        atom.symbol = atom_array.element[i]
+        atom.symbol = elements[i]
         
         if "b_factor" in annot_cat:
-            atom.b = atom_array.b_factor[i]
+            atom.b = b_factors[i]
         
         if "occupancy" in annot_cat:
-            atom.q = atom_array.occupancy[i]
+            atom.q = occupancies[i]
         
         if "charge" in annot_cat:
-            atom.formal_charge = atom_array.charge[i]
+            atom.formal_charge = charges[i]
         
-        atom.coord = tuple(atom_array.coord[..., i, :])
+        atom.coord = tuple(coords[i])
 
         atom.index = i+1
 
@@ -182,7 +211,7 @@ def convert_to_chempy_model(atom_array):
     
 
     if atom_array.bonds is not None:
-        for i, j, order in atom_array.bonds.as_array():
+        for i, j, order in atom_array.bonds.as_array().tolist():
             bond = Bond()
 
             if order != 0:
@@ -4,6 +4,8 @@ __all__ = ["PyMOLObject", "NonexistentObjectError", "ModifiedObjectError"]
 
 import numbers
 from functools import wraps
+from contextlib import contextmanager
+from collections import OrderedDict
 import numpy as np
 import biotite.structure as struc
 from .convert import convert_to_atom_array, convert_to_chempy_model
@@ -15,21 +17,136 @@ def validate(method):
     Check if the object name still exists and if the atom count has
     been modified.
     If this is the case, raise the appropriate exception.
+
+    As counting the atoms requires *PyMOL* to evaluate a selection
+    over all atoms, the atom count is only checked every
+    ``PyMOLObject._check_interval`` calls.
+    Within :meth:`PyMOLObject.batch()` the checks are skipped entirely.
     """
     @wraps(method)
     def wrapper(self, *args, **kwargs):
-        self._check_existence()
-        new_atom_count = self._cmd.count_atoms(f"model {self._name}")
-        if new_atom_count != self._atom_count:
-            raise ModifiedObjectError(
-                f"The number of atoms in the object changed "
-                f"from the original {self._atom_count} atoms "
-                f" to {new_atom_count} atoms"
-            )
+        if not isinstance(self._cmd, _CommandQueue):
+            self._check_existence()
+            self._unchecked_calls += 1
+            if self._unchecked_calls >= PyMOLObject._check_interval:
+                self._check_atom_count()
         return method(self, *args, **kwargs)
     return wrapper
 
 
+def _mask_to_intervals(mask):
+    """
+    Get the intervals, where the given boolean mask is true, as
+    ``(n, 2)`` array of start (inclusive) and stop (exclusive) indices.
+    """
+    # Indices where the mask changes from True to False
+    # or from False to True
+    # The '+1' makes each index refer to the position
+    # after the change i.e. the new value
+    # Comparing adjacent elements avoids the overhead of 'np.diff()'
+    # The comparison is performed on an 'uint8' view, as it is
+    # SIMD-accelerated in a wider range of NumPy versions
+    # than the comparison of booleans
+    int_mask = mask.view(np.uint8)
+    inner_changes = np.flatnonzero(
+        np.not_equal(int_mask[1:], int_mask[:-1])
+    ) + 1
+    # If first element is True, index 0 is inserted at start
+    # -> the first change is always from False to True
+    # If the last element is True, the length of mask is appended
+    # as exclusive stop index
+    # -> the last change is always from True to False
+    # The changes are written into a preallocated buffer to avoid
+    # copying them for each inserted index
+    start = 1 if mask[0] else 0
+    stop = start + len(inner_changes)
+    changes = np.empty(stop + (1 if mask[-1] else 0), dtype=int)
+    if mask[0]:
+        changes[0] = 0
+    if mask[-1]:
+        changes[-1] = len(mask)
+    changes[start : stop] = inner_changes
+    # -> Changes are alternating (F->T, T->F, F->T, ..., F->T, T->F)
+    # Reshape into pairs ([F->T, T->F], [F->T, T->F], ...)
+    # -> these are the intervals where the mask is True
+    return changes.reshape(-1, 2)
+
+
+def _filter_highest_occupancy_altloc(atoms, altloc_ids, occupancies):
+    """
+    Vectorized and deterministic variant of
+    :func:`biotite.structure.filter_highest_occupancy_altloc()`.
+
+    If multiple *altloc* IDs in a residue have the same occupancy,
+    the alphabetically first *altloc* ID is chosen.
+    """
+    # Atoms without altloc ID are always kept
+    altloc_filter = np.isin(altloc_ids, [".", "?", " ", ""])
+    letter_mask = np.char.isalpha(altloc_ids)
+    if not letter_mask.any():
+        return altloc_filter
+    
+    # Index of the residue each atom belongs to
+    res_starts = struc.get_residue_starts(atoms)
+    res_indices = np.zeros(len(altloc_ids), dtype=int)
+    res_indices[res_starts[1:]] = 1
+    res_indices = np.cumsum(res_indices)
+    letter_res_indices = res_indices[letter_mask]
+    # The sorted unique altloc IDs make the choice deterministic
+    unique_ids, id_indices = np.unique(
+        altloc_ids[letter_mask], return_inverse=True
+    )
+    # Sum of occupancies for each combination of residue and altloc ID
+    occupancy_sums = np.zeros((len(res_starts), len(unique_ids)))
+    np.add.at(
+        occupancy_sums,
+        (letter_res_indices, id_indices),
+        occupancies[letter_mask]
+    )
+    # Altloc IDs that do not appear in a residue must not be chosen
+    is_present = np.zeros(occupancy_sums.shape, dtype=bool)
+    is_present[letter_res_indices, id_indices] = True
+    occupancy_sums[~is_present] = -np.inf
+    # 'argmax()' chooses the first altloc ID in case of equal occupancy
+    highest_ids = np.argmax(occupancy_sums, axis=1)
+    altloc_filter[letter_mask] |= (
+        id_indices == highest_ids[letter_res_indices]
+    )
+    return altloc_filter
+
+
+class _CommandQueue:
+    """
+    A proxy for the *PyMOL* ``cmd`` module, that defers the execution
+    of commands until :meth:`flush()` is called.
+    Commands that query information from *PyMOL* are executed
+    immediately.
+    """
+
+    _QUERIES = frozenset([
+        "count_atoms", "count_states", "get_color_indices", "get_coordset",
+        "get_model", "get_object_list"
+    ])
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self._queue = []
+    
+    def __getattr__(self, attr):
+        command = getattr(self.cmd, attr)
+        if attr in _CommandQueue._QUERIES:
+            return command
+        def enqueue(*args, **kwargs):
+            self._queue.append((command, args, kwargs))
+        return enqueue
+    
+    def flush(self):
+        queue = self._queue
+        self._queue = []
+        for command, args, kwargs in queue:
+            command(*args, **kwargs)
+
+
 class PyMOLObject:
     """
     A wrapper around a *PyMOL object* (*PyMOL model*), usually created
@@ -46,6 +163,8 @@ class PyMOLObject:
     are deleted from the underlying *PyMOL* object.
     Calling methods of such an an invalidated object raises an
     :exc:`ModifiedObjectError`.
+    For performance reasons the atom count is not checked in every
+    method call, so this exception might be raised only in a later call.
     Likewise, calling methods of an object, of which the underlying
     *PyMOL* object does not exist anymore, raises an
     :exc:`NonexistentObjectError`.
@@ -73,9 +192,23 @@ class PyMOLObject:
     name : str
         The name of the *PyMOL* object.
     """
+
+    __slots__ = (
+        "_name", "_pymol", "_delete", "_cmd", "_atom_count",
+        "_unchecked_calls", "_selection_cache"
+    )
     
     _object_counter = 0
     _color_counter = 0
+    # Cached results of PyMOL queries as tuple of the 'cmd' instance
+    # the query was performed with and the set of names
+    _objects_cache = None
+    _colors_cache = None
+    # The number of validated method calls after which the atom count
+    # is checked again
+    _check_interval = 10
+    # The maximum number of cached selection strings for index arrays
+    _selection_cache_size = 32
     
 
     def __init__(self, name, pymol_instance=None, delete=True):
@@ -90,8 +223,10 @@ class PyMOLObject:
         self._pymol = pymol_instance
         self._delete = delete
         self._cmd = pymol_instance.cmd
-        self._check_existence()
+        self._check_existence(refresh=True)
         self._atom_count = self._cmd.count_atoms(f"model {self._name}")
+        self._unchecked_calls = 0
+        self._selection_cache = OrderedDict()
 
     def __del__(self):
         if self._delete:
@@ -99,6 +234,7 @@ class PyMOLObject:
                 # Try to delete this object from PyMOL
                 # Fails if PyMOL itself is already garbage collected
                 self._cmd.delete(self._name)
+                PyMOLObject._objects_cache = None
             except:
                 pass
 
@@ -152,8 +288,9 @@ class PyMOLObject:
             model = convert_to_chempy_model(atoms[0])
             cmd.load_model(model, name)
             # Append states corresponding to all following models
-            for coord in atoms.coord[1:]:
-                cmd.load_coordset(coord, name)
+            coord = atoms.coord
+            for i in range(1, len(coord)):
+                cmd.load_coordset(coord[i], name)
         else:
             raise TypeError("Expected 'AtomArray' or 'AtomArrayStack'")
 
@@ -205,19 +342,39 @@ class PyMOLObject:
             template = convert_to_atom_array(
                 model, include_bonds
             )
-            expected_length = None
-            coord = []
-            for i in range(self._cmd.count_states(self._name)):
-                state_coord = self._cmd.get_coordset(self._name, state=i+1)
-                if expected_length is None:
-                    expected_length = len(state_coord)
-                elif len(state_coord) != expected_length:
-                    raise ValueError(
-                        "The models have different numbers of atoms"
+            expected_length = template.array_length()
+            n_states = self._cmd.count_states(self._name)
+            if n_states == 1:
+                # The coordinates of the only state are already
+                # contained in the template
+                coord = template.coord[np.newaxis, ...]
+            else:
+                # Fill the coordinates of each state directly into the
+                # final array instead of stacking them afterwards
+                coord = np.empty(
+                    (n_states, expected_length, 3), dtype=np.float32
+                )
+                for i in range(n_states):
+                    # 'copy=0' gives direct access to the coordinates in
+                    # PyMOL's memory, which is safe, as they are
+                    # immediately copied into 'coord'
+                    state_coord = self._cmd.get_coordset(
+                        self._name, state=i+1, copy=0
                     )
-                coord.append(state_coord)
-            coord = np.stack(coord)
-            structure = struc.from_template(template, coord)
+                    if len(state_coord) != expected_length:
+                        raise ValueError(
+                            "The models have different numbers of atoms"
+                        )
+                    coord[i] = state_coord
+            # Share the annotation arrays and bonds of the template
+            # with the stack instead of copying them
+            structure = struc.AtomArrayStack(len(coord), expected_length)
+            for category in template.get_annotation_categories():
+                structure.set_annotation(
+                    category, template.get_annotation(category)
+                )
+            structure.bonds = template.bonds
+            structure.coord = coord
         
         else:
             model = self._cmd.get_model(self._name, state=state)
@@ -229,7 +386,7 @@ class PyMOLObject:
         if altloc == "occupancy":
             structure = structure[
                 ...,
-                struc.filter_highest_occupancy_altloc(
+                _filter_highest_occupancy_altloc(
                     structure, structure.altloc_id, structure.occupancy
                 )
             ]
@@ -264,14 +421,111 @@ class PyMOLObject:
             True if the *PyMOL* session contains an object with the name
             of this :class:`PyMOLObject`, false otherwise.
         """
-        return self._name in self._cmd.get_object_list()
+        return self._name in self._get_object_names(refresh=True)
 
-    def _check_existence(self):
-        if not self.exists():
+    @staticmethod
+    def invalidate_caches():
+        """
+        Clear the cached names of *PyMOL* objects and colors.
+
+        The names of existing *PyMOL* objects and registered colors are
+        cached to avoid querying *PyMOL* on each method call.
+        Names that are missing in the cache are looked up again
+        automatically, so calling this function is only necessary, if
+        *PyMOL* objects were deleted outside of *Ammolite*.
+        """
+        PyMOLObject._objects_cache = None
+        PyMOLObject._colors_cache = None
+
+    def _get_raw_cmd(self):
+        """
+        Get the actual *PyMOL* ``cmd`` module, even within
+        :meth:`batch()`.
+        """
+        if isinstance(self._cmd, _CommandQueue):
+            return self._cmd.cmd
+        return self._cmd
+
+    def _get_object_names(self, refresh=False):
+        cmd = self._get_raw_cmd()
+        cache = PyMOLObject._objects_cache
+        if refresh or cache is None or cache[0] is not cmd:
+            cache = (cmd, frozenset(cmd.get_object_list()))
+            PyMOLObject._objects_cache = cache
+        return cache[1]
+
+    def _get_color_names(self, refresh=False):
+        cmd = self._get_raw_cmd()
+        cache = PyMOLObject._colors_cache
+        if refresh or cache is None or cache[0] is not cmd:
+            cache = (
+                cmd,
+                frozenset(name for name, _ in cmd.get_color_indices())
+            )
+            PyMOLObject._colors_cache = cache
+        return cache[1]
+
+    def _check_existence(self, refresh=False):
+        # If the name is missing in the cached object names,
+        # the object might have been created after the cache was filled
+        # -> Query PyMOL again
+        if self._name not in self._get_object_names(refresh) \
+           and not self.exists():
             raise NonexistentObjectError(
                 f"A PyMOL object with the name {self._name} "
                 f"does not exist anymore"
             )
+    
+    @contextmanager
+    def batch(self):
+        """
+        Defer the *PyMOL* commands issued by methods of this object
+        within a ``with`` block until the end of the block.
+
+        Instead of each method call, the validity of this object is
+        checked only when entering and leaving the block.
+        At the end of the block the deferred commands are executed in
+        the order they were issued.
+        If an exception is raised within the block, the deferred
+        commands are discarded.
+
+        Notes
+        -----
+        Commands that are not issued via methods of this object
+        (e.g. direct ``cmd.remove()`` calls) are executed immediately,
+        i.e. before the deferred commands.
+        """
+        if isinstance(self._cmd, _CommandQueue):
+            # Already within a batch
+            yield
+            return
+        
+        self._check_existence()
+        self._check_atom_count()
+        queue = _CommandQueue(self._cmd)
+        self._cmd = queue
+        try:
+            yield
+        finally:
+            self._cmd = queue.cmd
+        self._check_existence()
+        self._check_atom_count()
+        queue.flush()
+
+    def _check_atom_count(self):
+        new_atom_count = self._cmd.count_atoms(f"model {self._name}")
+        if new_atom_count != self._atom_count:
+            # The cached object names might be outdated:
+            # Check if the object was deleted in the meantime
+            self._check_existence(refresh=True)
+            # The counter is not reset,
+            # so the atom count is checked again in each following call
+            raise ModifiedObjectError(
+                f"The number of atoms in the object changed "
+                f"from the original {self._atom_count} atoms "
+                f" to {new_atom_count} atoms"
+            )
+        self._unchecked_calls = 0
 
 
     @validate
@@ -290,6 +544,9 @@ class PyMOLObject:
         -------
         expression : str
             A *PyMOL* compatible selection expression.
+            If the index selects no atom, ``'none'`` is returned.
+            If the index selects all atoms, ``'model <name>'`` is
+            returned.
         """
         if isinstance(index, numbers.Integral):
             # PyMOLs indexing starts at 1
@@ -308,37 +565,28 @@ class PyMOLObject:
             mask = np.zeros(self._atom_count, dtype=bool)
             mask[index] = True
         
-        # Indices where the mask changes from True to False
-        # or from False to True
-        # The '+1' makes each index refer to the position
-        # after the change i.e. the new value
-        changes = np.where(np.diff(mask))[0] + 1
-        # If first element is True, insert index 0 at start
-        # -> the first change is always from False to True
-        if mask[0]:
-            changes = np.concatenate(([0], changes))
-        # If the last element is True, insert append length of mask
-        # as exclusive stop index
-        # -> the last change is always from True to False
-        if mask[-1]:
-            changes = np.concatenate((changes, [len(mask)]))
-        # -> Changes are alternating (F->T, T->F, F->T, ..., F->T, T->F)
-        # Reshape into pairs ([F->T, T->F], [F->T, T->F], ...)
-        # -> these are the intervals where the mask is True
-        intervals = np.reshape(changes, (-1, 2))
-
-        if len(intervals) > 0:
-            # Convert interval into selection string
-            # Two things to note:
-            # - PyMOLs indexing starts at 1-> 'start+1'
-            # - Stop in 'intervals' is exclusive -> 'stop+1-1' -> 'stop'
-            index_selection = " or ".join(
-                [f"index {start+1}-{stop}" for start, stop in intervals]
-            )
-            # Constrain the selection to given object name
-            return f"model {self._name} and ({index_selection})"
-        else:
+        # Handle common special cases without computing intervals
+        if not mask.any():
             return "none"
+        if mask.all():
+            return f"model {self._name}"
+        
+        intervals = _mask_to_intervals(mask)
+        # Convert interval into selection string
+        # Two things to note:
+        # - PyMOLs indexing starts at 1-> 'start+1'
+        # - Stop in 'intervals' is exclusive -> 'stop+1-1' -> 'stop'
+        # Intervals containing only a single atom are written as
+        # 'index <i>' instead of 'index <i>-<i>'
+        # Iterating over a list is faster than iterating over the
+        # NumPy array, which creates a NumPy scalar for each value
+        index_selection = " or ".join([
+            f"index {stop}" if start + 1 == stop
+            else f"index {start+1}-{stop}"
+            for start, stop in intervals.tolist()
+        ])
+        # Constrain the selection to given object name
+        return f"model {self._name} and ({index_selection})"
     
     def _into_selection(self, selection, not_none=False):
         """
@@ -350,10 +598,38 @@ class PyMOLObject:
         elif isinstance(selection, str):
             return f"model {self._name} and ({selection})"
         else:
-            sel = self.where(np.asarray(selection))
+            selection = np.asarray(selection)
+            if selection.dtype == bool \
+               or np.issubdtype(selection.dtype, np.integer):
+                sel = self._cached_where(selection)
+            else:
+                sel = self.where(selection)
             if sel == "none" and not_none:
                 raise ValueError("Selection contains no atoms")
             return sel
+    
+    def _cached_where(self, index):
+        """
+        Same as :meth:`where()` for boolean masks and integer index
+        arrays, but the selection strings of recently used indices are
+        cached.
+        """
+        # The content of the index array is sufficient as key,
+        # as the object name is fixed
+        # Boolean masks are packed to reduce the size of the key
+        index_bytes = np.packbits(index).tobytes() if index.dtype == bool \
+                      else index.tobytes()
+        key = (index.dtype.str, index.shape, index_bytes)
+        sel = self._selection_cache.get(key)
+        if sel is None:
+            sel = self.where(index)
+            self._selection_cache[key] = sel
+            if len(self._selection_cache) > PyMOLObject._selection_cache_size:
+                # Remove the least recently used selection
+                self._selection_cache.popitem(last=False)
+        else:
+            self._selection_cache.move_to_end(key)
+        return sel
 
 
 
@@ -508,8 +784,10 @@ class PyMOLObject:
             self._cmd.set_color(color_name, tuple(color))
         else:
             color_name = color
-            registered = [name for name, _ in self._cmd.get_color_indices()]
-            if color_name not in registered:
+            # Query PyMOL again if the color is missing in the cache,
+            # as it might have been registered in the meantime
+            if color_name not in self._get_color_names() and \
+               color_name not in self._get_color_names(refresh=True):
                 raise ValueError(
                     f"Unknown color '{color_name}'"
                 )
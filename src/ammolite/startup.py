@@ -109,11 +109,15 @@ def reset():
     If *PyMOL* is not yet running, launch *PyMOL* in object-oriented
     library mode.
     """
+    # Local import to avoid circular import
+    from .object import PyMOLObject
     global _pymol
 
     if _pymol is None: 
         _pymol = launch_pymol()
     _pymol.cmd.reinitialize()
+    # The cached object and color names are outdated now
+    PyMOLObject.invalidate_caches()
     setup_parameters(_pymol)
 
 
@@ -3,7 +3,9 @@ import numpy as np
 import pytest
 import biotite.structure as struc
 import biotite.structure.io.pdbx as pdbx
-from ammolite import PyMOLObject, reset
+from pymol import cmd
+from ammolite import PyMOLObject, ModifiedObjectError, \
+                     NonexistentObjectError, reset
 from .util import data_dir
 
 
@@ -145,4 +147,108 @@ def test_command(command_name, kwargs):
     structure.bonds = struc.connect_via_residue_names(structure)
     pymol_obj = PyMOLObject.from_structure(structure)
     command = getattr(PyMOLObject, command_name)
-    command(pymol_obj, **kwargs)
\ No newline at end of file
+    command(pymol_obj, **kwargs)
+
+
+def _create_object():
+    pdbx_file = pdbx.PDBxFile.read(join(data_dir, "1l2y.cif"))
+    structure = pdbx.get_structure(pdbx_file, model=1)
+    structure.bonds = struc.connect_via_residue_names(structure)
+    # Use B factor as indicator if the commands were executed
+    structure.set_annotation("b_factor", np.zeros(structure.array_length()))
+    return PyMOLObject.from_structure(structure), structure
+
+
+@pytest.mark.parametrize("nested", [False, True])
+def test_batch(nested):
+    reset()
+    pymol_obj, _ = _create_object()
+
+    with pymol_obj.batch():
+        if nested:
+            with pymol_obj.batch():
+                pymol_obj.alter(mask, "b=1.0")
+            # The end of the inner block does not execute the commands
+            assert (pymol_obj.to_structure(state=1).b_factor == 0.0).all()
+        else:
+            pymol_obj.alter(mask, "b=1.0")
+        pymol_obj.show("sticks", mask)
+        # The commands are not executed before the end of the block
+        assert (pymol_obj.to_structure(state=1).b_factor == 0.0).all()
+    
+    test_mask = (pymol_obj.to_structure(state=1).b_factor == 1.0)
+    assert np.array_equal(test_mask, mask)
+
+
+def test_batch_exception():
+    reset()
+    pymol_obj, _ = _create_object()
+
+    with pytest.raises(RuntimeError):
+        with pymol_obj.batch():
+            pymol_obj.alter(mask, "b=1.0")
+            raise RuntimeError()
+    
+    # The deferred commands are discarded
+    assert (pymol_obj.to_structure(state=1).b_factor == 0.0).all()
+    # Commands are executed immediately again after the block
+    pymol_obj.alter(mask, "b=1.0")
+    test_mask = (pymol_obj.to_structure(state=1).b_factor == 1.0)
+    assert np.array_equal(test_mask, mask)
+
+
+def test_modified_object():
+    reset()
+    pymol_obj, _ = _create_object()
+
+    cmd.remove(pymol_obj.where(mask))
+
+    # The atom count is only checked periodically
+    # -> the error is raised within the check interval
+    for _ in range(PyMOLObject._check_interval):
+        try:
+            pymol_obj.show("sticks")
+        except ModifiedObjectError:
+            break
+    else:
+        pytest.fail("Modification of the object was not detected")
+    # Once detected, the error is raised in every following call
+    for _ in range(2 * PyMOLObject._check_interval):
+        with pytest.raises(ModifiedObjectError):
+            pymol_obj.show("sticks")
+
+
+def test_reset_caches():
+    reset()
+    pymol_obj, structure = _create_object()
+    cmd.set_color("test_color", (1.0, 0.0, 0.0))
+    # Fill the caches
+    pymol_obj.color("test_color")
+
+    # 'reset()' removes all objects and user-defined colors
+    reset()
+    with pytest.raises(NonexistentObjectError):
+        pymol_obj.show("sticks")
+    pymol_obj = PyMOLObject.from_structure(structure)
+    with pytest.raises(ValueError):
+        pymol_obj.color("test_color")
+
+
+@pytest.mark.parametrize("invalidate", [False, True])
+def test_external_deletion(invalidate):
+    reset()
+    pymol_obj, _ = _create_object()
+    # Fill the cache
+    pymol_obj.show("sticks")
+
+    cmd.delete(pymol_obj.name)
+    if invalidate:
+        PyMOLObject.invalidate_caches()
+        with pytest.raises(NonexistentObjectError):
+            pymol_obj.show("sticks")
+    else:
+        # Without invalidation the deletion is detected
+        # at the latest by the periodic atom count check
+        with pytest.raises(NonexistentObjectError):
+            for _ in range(PyMOLObject._check_interval):
+                pymol_obj.show("sticks")
@@ -1,26 +1,40 @@
 import glob
 from os.path import join
 import itertools
+from functools import lru_cache
 import numpy as np
 import pytest
 import biotite.structure as struc
 import biotite.structure.io.pdbx as pdbx
 from pymol import cmd
 from ammolite import PyMOLObject, convert_to_chempy_model, reset
+from ammolite.object import _filter_highest_occupancy_altloc
 from .util import data_dir
 
 
+CIF_PATHS = glob.glob(join(data_dir, "*.cif"))
+
+
+@lru_cache(maxsize=None)
+def _read_pdbx(path):
+    """
+    Parse each file only once, as the same files are used in multiple
+    parametrized tests.
+    """
+    return pdbx.PDBxFile.read(path)
+
+
 @pytest.mark.parametrize(
     "path, altloc, state",
     itertools.product(
-        glob.glob(join(data_dir, "*.cif")),
+        CIF_PATHS,
         ["first", "occupancy", "all"],
         # AtomArray or AtomArrayStack
         [1, None]
     )
 )
 def test_to_biotite(path, altloc, state):
-    pdbx_file = pdbx.PDBxFile.read(path)
+    pdbx_file = _read_pdbx(path)
     ref_array = pdbx.get_structure(pdbx_file, model=state, altloc=altloc)
     
     reset()
@@ -38,13 +52,43 @@ def test_to_biotite(path, altloc, state):
     # as PyMOL determines bonds in another way than Biotite
 
 
-@pytest.mark.parametrize("path", glob.glob(join(data_dir, "*.cif")))
+def test_highest_occupancy_altloc():
+    altloc_ids = np.array([
+        # Equal occupancy of 'A' and 'B' -> 'A' is chosen,
+        # although 'B' appears first
+        "", "B", "A", "B", "A",
+        # Highest occupancy -> 'B' is chosen
+        # The non-letter altloc ID '1' is removed
+        "B", "A", "1",
+        # No letter altloc IDs
+        ".", "?", "1",
+    ])
+    occupancies = np.array([
+        1.0, 0.5, 0.5, 0.5, 0.5,
+        0.6, 0.4, 1.0,
+        1.0, 1.0, 1.0,
+    ])
+    ref_filter = np.array([
+        True, False, True, False, True,
+        True, False, False,
+        True, True, False,
+    ])
+    atoms = struc.AtomArray(len(altloc_ids))
+    atoms.res_id = np.array([1] * 5 + [2] * 3 + [3] * 3)
+
+    test_filter = _filter_highest_occupancy_altloc(
+        atoms, altloc_ids, occupancies
+    )
+    assert test_filter.tolist() == ref_filter.tolist()
+
+
+@pytest.mark.parametrize("path", CIF_PATHS)
 def test_to_pymol(path):
     reset()
     cmd.load(path, "test")
     ref_model = cmd.get_model("test", 1)
     
-    pdbx_file = pdbx.PDBxFile.read(path)
+    pdbx_file = _read_pdbx(path)
     atom_array = pdbx.get_structure(
         pdbx_file, model=1,
         extra_fields=["b_factor", "occupancy", "charge"]
@@ -54,31 +98,35 @@ def test_to_pymol(path):
     test_atoms = test_model.atom
     ref_atoms = [atom for atom in ref_model.atom if atom.alt in ("", "A")]
     assert len(test_atoms) == len(ref_atoms)
-    for test_atom, ref_atom in zip(test_atoms, ref_atoms):
-        assert test_atom.symbol == ref_atom.symbol
-        assert test_atom.name == ref_atom.name
-        assert test_atom.resn == ref_atom.resn
-        assert test_atom.ins_code == ref_atom.ins_code
-        assert test_atom.resi_number == ref_atom.resi_number
-        assert test_atom.b == pytest.approx(ref_atom.b)
-        assert test_atom.q == pytest.approx(ref_atom.q)
-        assert test_atom.hetatm == ref_atom.hetatm
-        assert test_atom.chain == ref_atom.chain
-        assert test_atom.coord == pytest.approx(ref_atom.coord)
-        # Charge information is not included in the CIF files
-        #assert test_atom.formal_charge == ref_atom.formal_charge 
+    # Compare the attributes of all atoms at once
+    for attr in [
+        "symbol", "name", "resn", "ins_code", "resi_number", "hetatm", "chain"
+    ]:
+        test_values = _get_attributes(test_atoms, attr, dtype=object)
+        ref_values = _get_attributes(ref_atoms, attr, dtype=object)
+        assert test_values.tolist() == ref_values.tolist()
+    for attr in ["b", "q", "coord"]:
+        test_values = _get_attributes(test_atoms, attr, dtype=float)
+        ref_values = _get_attributes(ref_atoms, attr, dtype=float)
+        assert test_values == pytest.approx(ref_values)
+    # 'formal_charge' is not compared,
+    # as charge information is not included in the CIF files
+
+
+def _get_attributes(atoms, attr, dtype):
+    return np.array([getattr(atom, attr) for atom in atoms], dtype=dtype)
 
 
 @pytest.mark.parametrize(
     "path, state",
     itertools.product(
-        glob.glob(join(data_dir, "*.cif")),
+        CIF_PATHS,
         # AtomArray or AtomArrayStack
         [1, None]
     )
 )
 def test_both_directions(path, state):
-    pdbx_file = pdbx.PDBxFile.read(path)
+    pdbx_file = _read_pdbx(path)
     ref_array = pdbx.get_structure(pdbx_file, model=state)
     ref_array.bonds = struc.connect_via_residue_names(ref_array)
 
@@ -9,21 +9,28 @@ from .util import data_dir
 
 
 SAMPLE_COUNT = 20
-@pytest.mark.parametrize("random_seed", [i for i in range(SAMPLE_COUNT)])
-def test_select(random_seed):
+@pytest.mark.parametrize(
+    "random_seed, mask_type",
+    [(i, "random") for i in range(SAMPLE_COUNT)] + [
+        (0, "all"), (0, "none"), (0, "single"), (0, "alternating")
+    ]
+)
+def test_select(random_seed, mask_type):
     reset()
-
-    pdbx_file = pdbx.PDBxFile.read(join(data_dir, "1l2y.cif"))
-    array = pdbx.get_structure(pdbx_file, model=1)
-    # Add bonds to avoid warning
-    array.bonds = struc.connect_via_residue_names(array)
-    
-    # Use B factor as indicator if the selection was correctly applied
-    array.set_annotation("b_factor", np.zeros(array.array_length()))
-    pymol_object = PyMOLObject.from_structure(array)
+    pymol_object, length = _create_object()
     
     np.random.seed(random_seed)
-    ref_mask = np.random.choice([False, True], array.array_length())
+    if mask_type == "random":
+        ref_mask = np.random.choice([False, True], length)
+    elif mask_type == "all":
+        ref_mask = np.ones(length, dtype=bool)
+    elif mask_type == "none":
+        ref_mask = np.zeros(length, dtype=bool)
+    elif mask_type == "single":
+        ref_mask = np.zeros(length, dtype=bool)
+        ref_mask[length // 2] = True
+    elif mask_type == "alternating":
+        ref_mask = np.arange(length) % 2 == 0
     
     # The method that is actually tested
     test_selection = pymol_object.where(ref_mask)
@@ -33,4 +40,83 @@ def test_select(random_seed):
     # Get the mask from the occupancy back again
     test_mask = (test_b_factor == 1.0)
 
-    assert np.array_equal(test_mask, ref_mask)
\ No newline at end of file
+    assert np.array_equal(test_mask, ref_mask)
+
+
+def _create_object():
+    pdbx_file = pdbx.PDBxFile.read(join(data_dir, "1l2y.cif"))
+    array = pdbx.get_structure(pdbx_file, model=1)
+    # Add bonds to avoid warning
+    array.bonds = struc.connect_via_residue_names(array)
+    # Use B factor as indicator if the selection was correctly applied
+    array.set_annotation("b_factor", np.zeros(array.array_length()))
+    return PyMOLObject.from_structure(array), array.array_length()
+
+
+def test_cached_selection_modified_mask():
+    """
+    Modifying a mask in place between two commands must not give the
+    cached selection of the previous content.
+    """
+    reset()
+    pymol_object, length = _create_object()
+
+    mask = np.zeros(length, dtype=bool)
+    mask[:5] = True
+    pymol_object.alter(mask, "b=1.0")
+    mask[:] = False
+    mask[5:10] = True
+    pymol_object.alter(mask, "b=2.0")
+
+    test_b_factor = pymol_object.to_structure(state=1).b_factor
+    ref_b_factor = np.zeros(length)
+    ref_b_factor[:5] = 1.0
+    ref_b_factor[5:10] = 2.0
+    assert test_b_factor.tolist() == ref_b_factor.tolist()
+
+
+def test_cached_selection_same_bytes():
+    """
+    A boolean mask and index arrays with the same underlying bytes
+    must not share a cache entry.
+    """
+    reset()
+    pymol_object, length = _create_object()
+
+    mask = np.zeros(length, dtype=bool)
+    mask[[0, 1, 5]] = True
+    # Same bytes as the unpacked and packed mask, respectively
+    indices = [mask.view(np.uint8), np.packbits(mask)]
+
+    mask_selection = pymol_object._into_selection(mask)
+    assert mask_selection == pymol_object.where(mask)
+    for index in indices:
+        index_selection = pymol_object._into_selection(index)
+        assert index_selection == pymol_object.where(index)
+        assert index_selection != mask_selection
+    # The mask still gives the correct selection
+    assert pymol_object._into_selection(mask) == mask_selection
+
+
+def test_cached_selection_eviction():
+    reset()
+    pymol_object, length = _create_object()
+    cache_size = PyMOLObject._selection_cache_size
+
+    masks = []
+    for i in range(cache_size + 1):
+        mask = np.zeros(length, dtype=bool)
+        mask[i] = True
+        masks.append(mask)
+    
+    pymol_object._into_selection(masks[0])
+    first_key = next(iter(pymol_object._selection_cache))
+    for mask in masks[1:]:
+        pymol_object._into_selection(mask)
+    
+    assert len(pymol_object._selection_cache) == cache_size
+    # The least recently used entry was removed
+    assert first_key not in pymol_object._selection_cache
+    # An evicted mask still gives the correct selection
+    assert pymol_object._into_selection(masks[0]) \
+        == pymol_object.where(masks[0])